@@ -0,0 +1,193 @@
+import math
+import numpy as np
+
+# Shared pothole simulation used by New.py, hdf_generator.py, mainproject.py
+# and "road data generator.py". The rough pothole kernel comes from the
+# compiled Cython module when it has been built (see setup.py); otherwise
+# Numba compiles it and caches the result next to this file, so every script
+# reuses one compile instead of JIT-ing its own copy.
+
+# --- 1. Smooth Pothole Mask (New.py) ---
+def create_pothole_mask(shape, center, radii, max_depth, rotation_deg=0):
+    """
+    Generates an elliptical or circular depth mask (peaking at max_depth)
+    within a given shape, simulating a realistic, non-square pothole.
+    """
+    rows, cols = shape
+    # 1-D row/column offsets; they only broadcast to the full 2D patch below
+    r = (np.arange(rows, dtype=np.float32) - center[0])[:, None]
+    c = (np.arange(cols, dtype=np.float32) - center[1])[None, :]
+
+    # Scalar trig via math (no ufunc dispatch), cast to float32 so multiplying
+    # the float32 offsets doesn't upcast to float64
+    rotation_rad = math.radians(rotation_deg)
+    cos_t = np.float32(math.cos(rotation_rad))
+    sin_t = np.float32(math.sin(rotation_rad))
+
+    # Apply rotation transformation
+    r_rot = r * cos_t - c * sin_t
+    c_rot = r * sin_t + c * cos_t
+
+    # Calculate elliptical distance
+    ellipse_dist = (c_rot / radii[1])**2 + (r_rot / radii[0])**2
+
+    # Create a smooth, deep center with fading edges
+    mask = np.exp(-ellipse_dist)
+    mask *= max_depth # Scale to depth in place, no extra temporary
+
+    mask[ellipse_dist > 4] = 0.0  # Cut off the very faint edges
+
+    return mask
+
+def pothole_bbox(center, radii, rotation_deg, cutoff, shape):
+    """
+    Returns (r_min, r_max, c_min, c_max): the tight axis-aligned box around
+    the rotated ellipse ellipse_dist <= cutoff, clipped to the matrix shape.
+    """
+    rotation_rad = math.radians(rotation_deg)
+    cos_t = math.cos(rotation_rad); sin_t = math.sin(rotation_rad)
+    r_half = math.sqrt(cutoff * ((radii[0] * cos_t)**2 + (radii[1] * sin_t)**2))
+    c_half = math.sqrt(cutoff * ((radii[0] * sin_t)**2 + (radii[1] * cos_t)**2))
+    r_min = max(0, math.floor(center[0] - r_half)); r_max = min(shape[0], math.floor(center[0] + r_half) + 1)
+    c_min = max(0, math.floor(center[1] - c_half)); c_max = min(shape[1], math.floor(center[1] + c_half) + 1)
+    return r_min, r_max, c_min, c_max
+
+# --- 2. Rough Pothole Kernel ---
+try:
+    # Ahead-of-time build from pothole_kernel.pyx: no Numba/LLVM, no JIT warmup
+    from pothole_kernel import blit_pothole
+except ImportError:
+    from numba import njit
+
+    @njit(fastmath=True, cache=True)
+    def blit_pothole(road, r_center, c_center, r_rad, c_rad, max_depth, cos_t, sin_t, noise_buf):
+        """
+        Fused pothole kernel: computes the rotated elliptical distance, the
+        exponential depth profile and the noise for each pixel of road (the
+        pothole bbox) and keeps the deeper of the pothole and the existing road.
+        The rotation comes in as precomputed cos/sin.
+        """
+        rows, cols = road.shape
+        for i in range(rows):
+            dr = i - r_center
+            for j in range(cols):
+                dc = j - c_center
+                r_rot = dr * cos_t - dc * sin_t
+                c_rot = dr * sin_t + dc * cos_t
+                ed = (c_rot / c_rad)**2 + (r_rot / r_rad)**2
+                if ed > 3.0:
+                    continue
+                val = math.exp(-ed / 1.5) * noise_buf[i, j] * max_depth
+                val = min(max(val, 0.0), max_depth)
+                if val > road[i, j]:
+                    road[i, j] = val
+
+# Flat scratch buffer for the per-pothole noise (one per process).
+# The buffer only grows, so most potholes reuse it without allocating.
+_noise_buf = np.empty(0, dtype=np.float32)
+
+def noise_patch(shape, rng):
+    """
+    Returns a view of the shared noise buffer with the given shape, filled
+    with N(1.0, 0.2) noise drawn from rng. The buffer is only reallocated
+    when a bigger patch is needed.
+    """
+    global _noise_buf
+    size = shape[0] * shape[1]
+    if size > _noise_buf.size:
+        _noise_buf = np.empty(size, dtype=np.float32)
+    patch = _noise_buf[:size].reshape(shape)
+    rng.standard_normal(out=patch, dtype=np.float32)
+    patch *= 0.2
+    patch += 1.0
+    return patch
+
+def create_pothole_mask_rough(road_view, center, radii, max_depth, cos_t, sin_t, rng):
+    """
+    Generates an elliptical mask with added Gaussian noise for irregular edges
+    and depth variation, simulating a rough pothole, and blits it straight
+    into road_view (a slice of the road matrix covering the pothole bbox).
+    """
+    # Noise is drawn with NumPy outside the kernel (Numba's RNG stream differs)
+    noise = noise_patch(road_view.shape, rng)
+    blit_pothole(road_view, center[0], center[1], radii[0], radii[1], max_depth,
+                 cos_t, sin_t, noise)
+
+# --- 3. Dispersed Pothole Simulation ---
+def draw_potholes(rng, total_potholes, shape, deep_cutoff=0.2, medium_cutoff=0.6, deep_depth=(5.0, 9.0)):
+    """
+    Draws every pothole's parameters up front as arrays (one RNG call per
+    parameter) and computes each pothole's bbox in the road matrix. The
+    arrays come back sorted by r_center.
+    Severity rolls below deep_cutoff give deep/large potholes, below
+    medium_cutoff medium ones, and the rest are shallow/small.
+    """
+    rows, cols = shape
+    # Potholes are distributed randomly across the ENTIRE width and length
+    r_centers = rng.integers(3, rows - 3, size=total_potholes)
+    c_centers = rng.integers(5, cols - 5, size=total_potholes)
+
+    # Randomly assign severity (deeper holes are larger)
+    severity_rolls = rng.random(total_potholes)
+    is_deep = severity_rolls < deep_cutoff
+    is_medium = ~is_deep & (severity_rolls < medium_cutoff)
+    max_depths = np.where(is_deep, rng.uniform(deep_depth[0], deep_depth[1], total_potholes),
+                 np.where(is_medium, rng.uniform(2.5, 5.0, total_potholes),
+                          rng.uniform(0.5, 2.5, total_potholes)))
+    r_radii = np.where(is_deep, rng.uniform(5, 10, total_potholes), # 0.5m to 1.0m radius in pixels
+              np.where(is_medium, rng.uniform(3, 5, total_potholes), # 0.3m to 0.5m radius
+                       rng.uniform(1, 3, total_potholes))) # 0.1m to 0.3m radius
+    c_radii = rng.uniform(r_radii * 0.8, r_radii * 1.2) # Elliptical variation
+    rotation_rads = np.deg2rad(rng.uniform(0, 180, total_potholes))
+    cos_ts = np.cos(rotation_rads); sin_ts = np.sin(rotation_rads)
+
+    # Tight bbox of the rotated ellipse at the ellipse_dist = 3.0 cutoff (semi-axes sqrt(3) * radius)
+    r_half = np.sqrt(3 * ((r_radii * cos_ts)**2 + (c_radii * sin_ts)**2))
+    c_half = np.sqrt(3 * ((r_radii * sin_ts)**2 + (c_radii * cos_ts)**2))
+
+    potholes = {
+        'r_center': r_centers, 'c_center': c_centers,
+        'r_radius': r_radii, 'c_radius': c_radii,
+        'max_depth': max_depths, 'cos_t': cos_ts, 'sin_t': sin_ts,
+        'r_min': np.clip(np.floor(r_centers - r_half).astype(int), 0, rows),
+        'r_max': np.clip(np.floor(r_centers + r_half).astype(int) + 1, 0, rows),
+        'c_min': np.clip(np.floor(c_centers - c_half).astype(int), 0, cols),
+        'c_max': np.clip(np.floor(c_centers + c_half).astype(int) + 1, 0, cols),
+    }
+    # Sort by row so blits sweep down the road matrix instead of jumping around it
+    order = np.argsort(r_centers, kind='stable')
+    return {k: v[order] for k, v in potholes.items()}
+
+def place_potholes(road_matrix, potholes, rng, row_offset=0):
+    """
+    Blits every pothole from draw_potholes into road_matrix in place.
+    road_matrix may also be a block of the road starting at row row_offset,
+    in which case each pothole is clipped to the rows the block covers.
+    """
+    p = potholes
+    block_rows = road_matrix.shape[0]
+    for i in range(len(p['r_center'])):
+        r_min = max(p['r_min'][i] - row_offset, 0); r_max = min(p['r_max'][i] - row_offset, block_rows)
+        if r_max <= r_min:
+            continue
+        road_view = road_matrix[r_min:r_max, p['c_min'][i]:p['c_max'][i]]
+        local_center = (p['r_center'][i] - row_offset - r_min, p['c_center'][i] - p['c_min'][i])
+        create_pothole_mask_rough(road_view, local_center, (p['r_radius'][i], p['c_radius'][i]),
+                                  p['max_depth'][i], p['cos_t'][i], p['sin_t'][i], rng)
+
+def stream_potholes(dset, potholes, rng, block_rows):
+    """
+    Rasterises the potholes straight into the 2D dataset dset, block_rows
+    rows at a time, so only one block is held in memory instead of the
+    whole road. A pothole crossing a block edge is blitted into each block
+    it touches; its noise is per-pixel, so the split is invisible.
+    """
+    rows, cols = dset.shape
+    scratch = np.empty((block_rows, cols), dtype=np.float32)
+    for r0 in range(0, rows, block_rows):
+        r1 = min(r0 + block_rows, rows)
+        block = scratch[:r1 - r0]
+        block.fill(0.0)
+        in_block = np.flatnonzero((potholes['r_min'] < r1) & (potholes['r_max'] > r0))
+        place_potholes(block, {k: v[in_block] for k, v in potholes.items()}, rng, row_offset=r0)
+        dset[r0:r1, :] = block
@@ -0,0 +1,37 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# Cython build of the rough pothole kernel from pothole_core.py, for machines
+# where Numba/LLVM is unwanted. Build in place with:
+#     python setup.py build_ext --inplace
+from libc.math cimport expf
+
+cdef void _blit_pothole(float[:, :] road, int r_center, int c_center, float r_rad, float c_rad,
+                        float max_depth, float cos_t, float sin_t,
+                        const float[:, ::1] noise_buf) noexcept nogil:
+    cdef Py_ssize_t i, j
+    cdef float dr, dc, r_rot, c_rot, ed, val
+    for i in range(road.shape[0]):
+        dr = <float>(i - r_center)
+        for j in range(road.shape[1]):
+            dc = <float>(j - c_center)
+            r_rot = dr * cos_t - dc * sin_t
+            c_rot = dr * sin_t + dc * cos_t
+            ed = (c_rot / c_rad) * (c_rot / c_rad) + (r_rot / r_rad) * (r_rot / r_rad)
+            if ed > 3.0:
+                continue
+            val = expf(-ed / <float>1.5) * noise_buf[i, j] * max_depth
+            if val < 0.0:
+                val = 0.0
+            elif val > max_depth:
+                val = max_depth
+            if val > road[i, j]:
+                road[i, j] = val
+
+def blit_pothole(float[:, :] road, int r_center, int c_center, float r_rad, float c_rad,
+                 float max_depth, float cos_t, float sin_t, const float[:, ::1] noise_buf):
+    """
+    Same fused kernel as the Numba blit_pothole in pothole_core.py: blits
+    one rough pothole into road (the float32 pothole bbox view) in a single
+    pass. The loop runs without the GIL.
+    """
+    with nogil:
+        _blit_pothole(road, r_center, c_center, r_rad, c_rad, max_depth, cos_t, sin_t, noise_buf)
@@ -0,0 +1,18 @@
+import sys
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+
+# Builds the optional Cython pothole kernel next to pothole_core.py:
+#     python setup.py build_ext --inplace
+# pothole_core.py uses it when it is importable and falls back to Numba otherwise.
+if sys.platform == "win32":
+    extra_compile_args = ["/O2", "/fp:fast"]
+else:
+    extra_compile_args = ["-O3", "-ffast-math", "-march=native"]
+
+setup(
+    name="pothole_kernel",
+    ext_modules=cythonize(
+        [Extension("pothole_kernel", ["pothole_kernel.pyx"], extra_compile_args=extra_compile_args)]
+    ),
+)